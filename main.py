@@ -2,37 +2,119 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import json
+import orjson
 import os
 import logging
+import logging.handlers
 import datetime
 import asyncio
+import atexit
+import functools
+import hashlib
+import queue
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
 
 # Configure logging
 # This sets up both file and console logging to track bot operations and errors
 # File logs persist across restarts while console logs provide real-time monitoring
+#
+# Log records are pushed onto an in-process queue and written by a background
+# thread, so logging calls made inside async handlers never block the event
+# loop on disk I/O - they only pay for a lock and an enqueue
+_log_queue = queue.Queue(-1)  # Unbounded so logging never drops or blocks
 logging.basicConfig(
     level=logging.INFO,  # Only log messages with severity INFO or higher
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',  # Structured format for easier parsing
-    handlers=[
-        logging.FileHandler("discord.log"),  # Persistent logs for post-mortem analysis
-        logging.StreamHandler()  # Console output for real-time monitoring
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.FileHandler("discord.log"),  # Persistent logs for post-mortem analysis
+    logging.StreamHandler()  # Console output for real-time monitoring
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Drain remaining records on shutdown
+
+# Red is the color used for every moderation embed; Color.red() is a
+# classmethod call that builds a fresh Color object, so construct it once
+# at import time and reuse it everywhere
+_RED = discord.Color.red()
+
+# Duration strings like "30s", "5m", "2h", "1d" are parsed with a single
+# regex match and a multiplier table instead of a chain of endswith checks
+_DUR_RE = re.compile(r"(\d+)([smhd])")
+_MULT = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Timedeltas are immutable, so the auto-timeout span can be built once at
+# import instead of allocating a fresh object per warning
+_ONE_HOUR = datetime.timedelta(hours=1)
+
+# Discord rejects embeds with more than 25 fields, so /warnings can never
+# render more than this many rows no matter how much history is retained
+_MAX_EMBED_FIELDS = 25
+
+# In-memory representation of one warning
+# slots=True drops the per-instance __dict__ and the epoch-float timestamp
+# replaces the 27+ byte ISO string, so tens of thousands of retained
+# warnings cost a fraction of the RAM of the old per-warning dicts. The
+# journal stores the same epoch floats; replay converts ISO strings from
+# lines written by older versions.
+@dataclass(slots=True)
+class WarnRecord:
+    reason: str
+    moderator: int
+    timestamp: float  # Unix epoch seconds
+
+# Automatic-action dispatch table for the warning threshold system
+# Each entry maps an action name to (log label, coroutine factory,
+# past-tense phrase for the announcement embed, optional duration label)
+# so the tail of warn() runs one shared embed/send/log path instead of
+# three duplicated blocks
+_AUTO_ACTIONS = {
+    "timeout": (
+        "Auto-Timeout",
+        lambda user, count: user.timeout(
+            discord.utils.utcnow() + _ONE_HOUR,
+            reason=f"Automatic timeout after {count} warnings"
+        ),
+        "timed out for 1 hour",
+        "1 hour",
+    ),
+    "kick": (
+        "Auto-Kick",
+        lambda user, count: user.kick(reason=f"Automatic kick after {count} warnings"),
+        "kicked",
+        None,
+    ),
+    "ban": (
+        "Auto-Ban",
+        lambda user, count: user.ban(reason=f"Automatic ban after {count} warnings"),
+        "banned",
+        None,
+    ),
+}
 
 # Bot configuration
 class ModBot(commands.Bot):
     """
     Custom Bot class that extends discord.ext.commands.Bot
-    
+
     This class handles:
     1. Configuration management (loading/saving settings to JSON)
-    2. Initialization with required permissions (members, message_content)
-    3. Command registration and synchronization
-    
-    The configuration is persisted between restarts and contains:
-    - Log channel mappings (per guild)
-    - Warning thresholds for automated actions
-    - User warning history
+    2. Warning storage (append-only journal + in-memory counters)
+    3. Initialization with required permissions (members, message_content)
+    4. Command registration and synchronization
+
+    Persistent state is split by write frequency:
+    - config.json: log channel mappings and warning thresholds (rare writes)
+    - warnings.ndjson: per-warning journal records (append-only hot path)
+
+    In memory, only per-user warning counts are kept, keyed by
+    (guild_id, user_id) integer tuples; full histories stay on disk and
+    are streamed back as slotted WarnRecord instances when displayed.
     """
     def __init__(self):
         # Set up intents (permissions) the bot needs to function
@@ -45,23 +127,28 @@ class ModBot(commands.Bot):
         # Initialize the parent Bot class with our configuration
         super().__init__(command_prefix="!", intents=intents)
         self.config_file = "config.json"
+        self.warnings_file = "warnings.ndjson"
+        # Dirty flag consumed by the background config saver task; commands
+        # set it instead of writing the file themselves
+        self._config_dirty = asyncio.Event()
         self.load_config()
-        
+        self.load_warnings()
+
     def load_config(self):
         """
         Load configuration from JSON file or create default if not exists
-        
-        The configuration structure is:
+
+        The configuration holds only the small, rarely-changing settings:
         {
             "log_channels": {guild_id: channel_id, ...},
-            "warn_thresholds": {"3": "timeout", "5": "kick", "7": "ban"},
-            "warnings": {guild_id: {user_id: [warning_objects], ...}, ...}
+            "warn_thresholds": {"3": "timeout", "5": "kick", "7": "ban"}
         }
+
+        Warning history lives in a separate append-only journal (see
+        load_warnings) so that issuing a warning never rewrites this file.
         """
-        if os.path.exists(self.config_file):
-            with open(self.config_file, "r") as f:
-                self.config = json.load(f)
-        else:
+        fresh_config = not os.path.exists(self.config_file)
+        if fresh_config:
             # Default configuration with escalating consequences for warnings
             self.config = {
                 "log_channels": {},  # Maps guild IDs to log channel IDs
@@ -69,35 +156,402 @@ class ModBot(commands.Bot):
                     "3": "timeout",   # 3 warnings = timeout
                     "5": "kick",      # 5 warnings = kick
                     "7": "ban"        # 7 warnings = ban
-                },
-                "warnings": {}        # Stores warning history per guild and user
+                }
             }
+        else:
+            with open(self.config_file, "rb") as f:
+                self.config = orjson.loads(f.read())
+
+        # Precompile the threshold table into an int -> action dict so the
+        # warn hot path does one dict lookup instead of re-parsing the
+        # string keys on every invocation. Re-derive this map if the
+        # thresholds are ever edited at runtime.
+        self._threshold_map = {int(k): v for k, v in self.config["warn_thresholds"].items()}
+
+        # How many warnings per user to retain as readable history. The
+        # lifetime counter driving threshold actions is unaffected; the cap
+        # only bounds what /warnings renders and what compaction keeps.
+        self.warn_history_cap = self.config.get("warn_history_cap", 50)
+
+        # In-memory view of log_channels keyed by integer guild id - JSON
+        # forces string keys on disk, but hot paths should not pay for a
+        # str(guild.id) allocation per action. Stringified back in
+        # _save_sync at the serialization boundary.
+        self.log_channels = {int(k): v for k, v in self.config["log_channels"].items()}
+
+        # Memoized guild id -> log channel object, filled lazily by
+        # log_action and directly by /setup. Avoids a str(guild.id) plus
+        # config lookup plus guild.get_channel scan on every logged action.
+        self._log_channel_cache = {}
+
+        # Set of guild ids with logging configured. Call sites test this
+        # before awaiting log_action at all, so guilds that never ran
+        # /setup don't pay for a no-op coroutine per moderation action.
+        self._log_channel_ids = set(self.log_channels)
+
+        if fresh_config:
+            self._save_sync()
+
+    def load_warnings(self):
+        """
+        Load warning history from the append-only journal
+
+        Warnings are stored as one JSON object per line ("NDJSON") so that
+        recording a warning is a single small append instead of a rewrite of
+        the entire configuration. The journal is replayed at startup to
+        rebuild only the small hot-path structure:
+
+            self._warn_counts = {(guild_id, user_id): count, ...}
+
+        Full warning details stay on disk and are streamed back out on
+        demand by get_user_warnings - the /warn hot path and resident
+        memory are both independent of how long a server's history grows.
+
+        A line with "clear": true acts as a tombstone that wipes the history
+        for that user (written by /clearwarnings). Tombstoned lines stay in
+        the file until compaction rewrites it from live state, which only
+        happens when enough of the file is dead weight (see
+        _compact_warnings).
+        """
+        self._warn_counts = {}
+        self._dead_lines = 0
+        self._journal_lines = 0
+
+        # One-time migration: older versions stored warnings inside
+        # config.json. Move them into the journal and rewrite the config
+        # once, so subsequent warns only ever append.
+        legacy = self.config.pop("warnings", None)
+        if legacy:
+            with open(self.warnings_file, "ab") as f:
+                for guild_id, users in legacy.items():
+                    for user_id, entries in users.items():
+                        for warning in entries:
+                            record = {"guild_id": guild_id, "user_id": user_id, **warning}
+                            f.write(orjson.dumps(record) + b"\n")
+            self._save_sync()
+
+        # Replay the journal to rebuild in-memory state
+        if os.path.exists(self.warnings_file):
+            with open(self.warnings_file, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = orjson.loads(line)
+                    self._journal_lines += 1
+                    # int() also covers legacy records migrated with str ids
+                    key = (int(record["guild_id"]), int(record["user_id"]))
+                    if record.get("clear"):
+                        # Tombstone - discard everything recorded so far.
+                        # Dead weight is the records it erases plus the
+                        # tombstone line itself.
+                        self._dead_lines += self._warn_counts.get(key, 0) + 1
+                        self._warn_counts.pop(key, None)
+                        continue
+                    self._warn_counts[key] = self._warn_counts.get(key, 0) + 1
+
+        # Compact before opening the append handle so a bloated journal
+        # is rewritten from live state exactly once, at startup
+        self._compact_warnings()
+
+        # Open the journal once in append mode at the OS level; batched
+        # records are pushed to disk with a single os.write per batch by
+        # the background flush loop.
+        self._warn_fd = os.open(self.warnings_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._warn_queue: asyncio.Queue = asyncio.Queue()
+
+    def _compact_warnings(self):
+        """
+        Rewrite the journal from live in-memory state when it is bloated
+
+        Appending tombstones instead of rewriting keeps /clearwarnings O(1),
+        but dead lines accumulate. When more than 30% of the journal is
+        dead - records erased by a tombstone plus the tombstone lines
+        themselves - or the file exceeds 1 MB, re-read the journal, drop
+        the dead lines, and rewrite it atomically (tmp file + os.replace).
+        Runs at startup only, so the steady-state warn path never pays
+        for it.
+        """
+        if not os.path.exists(self.warnings_file):
+            return
+        bloated = (
+            (self._journal_lines and self._dead_lines / self._journal_lines > 0.3)
+            or os.path.getsize(self.warnings_file) > 1_000_000
+        )
+        if not bloated:
+            return
+
+        # Second pass over the journal, keeping only records that survive
+        # their tombstones - original lines are preserved verbatim. The
+        # bounded deque keeps at most warn_history_cap recent lines per
+        # user, so ancient history is shed during compaction.
+        live = {}
+        with open(self.warnings_file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = orjson.loads(line)
+                key = (int(record["guild_id"]), int(record["user_id"]))
+                if record.get("clear"):
+                    live.pop(key, None)
+                else:
+                    live.setdefault(key, deque(maxlen=self.warn_history_cap)).append(line)
+
+        live_lines = sum(len(lines) for lines in live.values())
+        if live_lines >= self._journal_lines:
+            return
+
+        tmp_file = self.warnings_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            for lines in live.values():
+                for line in lines:
+                    f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.warnings_file)
+        logging.info(f"Compacted warnings journal: {self._journal_lines} lines -> {live_lines}")
+        self._journal_lines = live_lines
+        self._dead_lines = 0
+
+    def _read_warnings_sync(self, guild_id, user_id):
+        """
+        Stream one user's warning history out of the journal
+
+        Cold path backing the /warnings display: scan the journal line by
+        line, keep only records for the requested user, and honour clear
+        tombstones along the way. Returns the warn_history_cap most recent
+        entries as WarnRecord instances - the bounded deque means a
+        prolific offender's display cost stays constant.
+        """
+        entries = deque(maxlen=self.warn_history_cap)
+        if not os.path.exists(self.warnings_file):
+            return entries
+        with open(self.warnings_file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = orjson.loads(line)
+                if int(record["guild_id"]) != guild_id or int(record["user_id"]) != user_id:
+                    continue
+                if record.get("clear"):
+                    entries.clear()
+                    continue
+                ts = record["timestamp"]
+                if isinstance(ts, str):
+                    ts = datetime.datetime.fromisoformat(ts).timestamp()
+                entries.append(WarnRecord(record["reason"], record["moderator"], ts))
+        return entries
+
+    async def get_user_warnings(self, guild_id, user_id):
+        """
+        Fetch one user's warning history without blocking the event loop
+
+        Waits for any queued-but-unflushed records to reach the journal
+        (so a /warnings right after a /warn sees the new entry), then
+        streams the file in a worker thread.
+        """
+        await self._warn_queue.join()
+        return await asyncio.to_thread(self._read_warnings_sync, guild_id, user_id)
+
+    async def append_warning(self, guild_id, user_id, warning=None, clear=False):
+        """
+        Queue a single warning record (or clear tombstone) for the journal
+
+        The record only goes onto an in-process queue here; the flush loop
+        drains everything pending and writes the whole batch with one
+        write+fsync, amortizing syscall overhead across a warn-storm
+        instead of paying it per warning.
+        """
+        record = {"guild_id": guild_id, "user_id": user_id}
+        if clear:
+            record["clear"] = True
+        else:
+            # Epoch floats on disk as well as in memory; replay still
+            # accepts ISO strings from lines written by older versions
+            record["reason"] = warning.reason
+            record["moderator"] = warning.moderator
+            record["timestamp"] = warning.timestamp
+        await self._warn_queue.put(record)
+
+    async def _flush_loop(self):
+        """
+        Background task that drains queued warning records to disk
+
+        Blocks until at least one record is queued, sleeps briefly to let a
+        burst accumulate, then drains the queue, encodes all pending records
+        as one NDJSON blob, and issues a single write+fsync for the batch.
+
+        A failed write must not kill this task (persistence would silently
+        stop for the life of the process) and must not skip the acks
+        (queue.join() in get_user_warnings would deadlock every subsequent
+        /warnings call), so errors are logged and the batch is acked
+        regardless - the in-memory counters stay correct either way.
+        """
+        while not self.is_closed():
+            records = [await self._warn_queue.get()]
+            # Give a burst of warnings a moment to pile up behind the first
+            await asyncio.sleep(0.5)
+            while True:
+                try:
+                    records.append(self._warn_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                buf = b"".join(orjson.dumps(record) + b"\n" for record in records)
+                os.write(self._warn_fd, buf)
+                os.fsync(self._warn_fd)
+            except Exception as e:
+                logging.error(f"Failed to flush {len(records)} warning record(s) to journal: {e}")
+            finally:
+                # Ack only after the write attempt, so queue.join() in
+                # get_user_warnings implies on-disk visibility - and ack
+                # even on failure so readers can never deadlock
+                for _ in records:
+                    self._warn_queue.task_done()
+
+    def _command_fingerprint(self, dev_guild_id):
+        """
+        Hash the local command tree (and sync scope) into a fingerprint
+
+        Persisted in the config after a successful sync so steady-state
+        restarts can prove nothing changed and skip the sync API traffic
+        entirely. The dev guild id is hashed in too, so switching between
+        guild-scoped and global sync forces a resync.
+        """
+        try:
+            payload = [c.to_dict(self.tree) for c in self.tree.get_commands()]
+        except TypeError:  # discord.py < 2.4 takes no tree argument
+            payload = [c.to_dict() for c in self.tree.get_commands()]
+        blob = json.dumps([dev_guild_id, payload], sort_keys=True).encode()
+        return hashlib.blake2b(blob).hexdigest()
+
+    async def setup_hook(self):
+        """
+        One-time async setup run after login but before connecting
+
+        Starts the background flush loop that persists queued warning
+        records to disk, and synchronizes slash commands. Syncing here
+        instead of on_ready means it runs once per process rather than on
+        every gateway reconnect, and the sync is skipped outright when the
+        command tree hasn't changed since the last successful sync.
+
+        If DEV_GUILD_ID is set, commands are copied to that guild and
+        synced guild-scoped - instant propagation for development instead
+        of the up-to-an-hour global rollout.
+        """
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        self._save_task = asyncio.create_task(self._config_saver())
+
+        dev_guild_id = os.getenv("DEV_GUILD_ID")
+        fingerprint = self._command_fingerprint(dev_guild_id)
+        if self.config.get("_cmd_fp") == fingerprint:
+            logging.info("Command tree unchanged; skipping sync")
+            return
+
+        try:
+            if dev_guild_id:
+                dev_guild = discord.Object(id=int(dev_guild_id))
+                self.tree.copy_global_to(guild=dev_guild)
+                synced = await self.tree.sync(guild=dev_guild)
+            else:
+                synced = await self.tree.sync()
+            logging.info(f"Synced {len(synced)} command(s)")
+            # Remember what was synced so identical restarts skip the call
+            self.config["_cmd_fp"] = fingerprint
             self.save_config()
-    
+        except Exception as e:
+            logging.error(f"Failed to sync commands: {e}")
+
     def save_config(self):
         """
-        Save current configuration to JSON file
-        Uses indentation for human readability of the config file
+        Request a config save - coalesced by the background saver task
+
+        Mutating commands just flip the dirty event and return; the saver
+        task wakes up, writes once, and a burst of mutations collapses into
+        a single disk write. The write itself runs in a worker thread so
+        the gateway loop keeps servicing events throughout.
         """
-        with open(self.config_file, "w") as f:
-            json.dump(self.config, f, indent=4)
-    
+        self._config_dirty.set()
+
+    async def _config_saver(self):
+        """
+        Background task that persists the config whenever it is dirty
+
+        A single consumer task means writes can never overlap, and clearing
+        the event before writing ensures a mutation that lands mid-write
+        triggers another save rather than being lost.
+
+        Serialization happens here on the event loop - the worker thread
+        only ever touches a finished bytes blob, so a /setup mutating the
+        config mid-save can never race the encoder. A failed write is
+        logged rather than allowed to kill the task, since a dead saver
+        would leave every later save_config() setting an event nobody
+        consumes.
+        """
+        while not self.is_closed():
+            await self._config_dirty.wait()
+            self._config_dirty.clear()
+            try:
+                data = self._serialize_config()
+                await asyncio.to_thread(self._write_config, data)
+            except Exception as e:
+                logging.error(f"Failed to save config: {e}")
+
+    def _serialize_config(self):
+        """
+        Encode the current config to bytes - must run on the event loop so
+        the dicts it reads cannot be mutated mid-encode
+        """
+        # Convert int guild keys back to the string keys JSON requires
+        self.config["log_channels"] = {str(k): v for k, v in self.log_channels.items()}
+        # Compact output - nothing machine-side benefits from pretty
+        # printing, and skipping indentation keeps orjson on its fastest
+        # path and writes a third of the bytes
+        return orjson.dumps(self.config, option=orjson.OPT_APPEND_NEWLINE)
+
+    def _write_config(self, data):
+        """
+        Write pre-serialized config bytes to disk - safe to run in a worker
+        thread since it never touches mutable bot state
+
+        Writes to a temp file and os.replace()s it into place so a crash
+        mid-write can never leave a truncated config behind.
+        """
+        tmp_file = self.config_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.config_file)
+
+    def _save_sync(self):
+        """
+        Synchronous serialize-and-write - used directly during startup
+        before the saver task exists
+
+        Only the small settings dict is written here; warning history is
+        persisted separately via the append-only journal.
+        """
+        self._write_config(self._serialize_config())
+
     async def on_ready(self):
         """
         Event handler triggered when bot successfully connects to Discord
-        
-        This method:
-        1. Logs the successful connection
-        2. Synchronizes slash commands with Discord's API
-        3. Handles any errors during command synchronization
+
+        Command synchronization happens in setup_hook so reconnects do not
+        re-sync. This handler logs the connection and warms the log-channel
+        cache for every guild the bot can see, so the first moderation
+        action per guild doesn't pay for the lazy resolution either.
         """
         logging.info(f"Bot is ready! Logged in as {self.user}")
-        try:
-            # Sync slash commands with Discord - required for app_commands to work
-            synced = await self.tree.sync()
-            logging.info(f"Synced {len(synced)} command(s)")
-        except Exception as e:
-            logging.error(f"Failed to sync commands: {e}")
+        for guild in self.guilds:
+            channel_id = self.log_channels.get(guild.id)
+            if channel_id is not None:
+                channel = guild.get_channel(channel_id)
+                if channel is not None:
+                    self._log_channel_cache[guild.id] = channel
 
 # Initialize the bot instance
 bot = ModBot()
@@ -121,41 +575,34 @@ async def log_action(guild, action, target, moderator, reason, duration=None):
     Returns:
         None - but sends a message to the configured log channel if available
     """
-    guild_id = str(guild.id)
-    # Skip logging if no log channel is configured for this guild
-    if guild_id not in bot.config["log_channels"]:
-        return
-    
-    log_channel_id = bot.config["log_channels"][guild_id]
-    log_channel = guild.get_channel(log_channel_id)
-    
-    # Skip if channel no longer exists or bot can't access it
-    if not log_channel:
-        return
+    # Fast path: memoized channel object keyed by integer guild id
+    # Callers have already tested bot._log_channel_ids, so a configured
+    # channel id is guaranteed to exist here
+    log_channel = bot._log_channel_cache.get(guild.id)
+    if log_channel is None:
+        log_channel = _resolve_log(guild.id, bot.log_channels[guild.id])
+
+        # Skip if channel no longer exists or bot can't access it
+        if not log_channel:
+            return
+
+        # Memoize so subsequent actions skip the config and channel lookups
+        bot._log_channel_cache[guild.id] = log_channel
     
     # Create a standardized embed for the log entry
     embed = discord.Embed(
         title=f"Moderation Action: {action}",
-        color=discord.Color.red(),  # Red color consistently used for moderation actions
-        timestamp=datetime.datetime.now()  # Timestamp for accurate audit logs
+        color=_RED,  # Red color consistently used for moderation actions
+        timestamp=discord.utils.utcnow()  # UTC timestamp for accurate audit logs
     )
     
     # Handle both user objects and other targets (like channels)
     if hasattr(target, 'mention'):
-        # Handle Discord's new username system (no discriminators)
-        user_display = f"{target.mention} ({target.name})"
-        # Add discriminator if available (for older Discord versions)
-        if hasattr(target, 'discriminator') and target.discriminator != '0':
-            user_display = f"{target.mention} ({target.name}#{target.discriminator})"
-        embed.add_field(name="User", value=user_display, inline=False)
+        embed.add_field(name="User", value=_fmt_user(target), inline=False)
     else:
         embed.add_field(name="Target", value=f"{target}", inline=False)
-    
-    # Handle moderator display name with compatibility for new username system
-    mod_display = f"{moderator.mention} ({moderator.name})"
-    if hasattr(moderator, 'discriminator') and moderator.discriminator != '0':
-        mod_display = f"{moderator.mention} ({moderator.name}#{moderator.discriminator})"
-    embed.add_field(name="Moderator", value=mod_display, inline=False)
+
+    embed.add_field(name="Moderator", value=_fmt_user(moderator), inline=False)
     
     embed.add_field(name="Reason", value=reason or "No reason provided", inline=False)
     
@@ -169,6 +616,46 @@ async def log_action(guild, action, target, moderator, reason, duration=None):
     
     await log_channel.send(embed=embed)
 
+# Memoized channel resolution for log_action cache misses
+# guild.get_channel is an ID scan over the guild's channel cache; bounding
+# the memo at 256 entries keeps it O(1) amortized without letting stale
+# channel objects accumulate unbounded. /setup clears it on reconfiguration.
+@functools.lru_cache(maxsize=256)
+def _resolve_log(guild_id, channel_id):
+    g = bot.get_guild(guild_id)
+    return g.get_channel(channel_id) if g else None
+
+# Shared factory for the common "no warnings" reply used by both
+# /warnings and /clearwarnings; only the trailing verb differs
+def _no_warn_embed(user, verb=""):
+    return discord.Embed(
+        title="No Warnings",
+        description=f"{user.mention} has no warnings{verb}.",
+        color=_RED
+    )
+
+# Helper to format a user/member for log embeds
+def _fmt_user(u):
+    """
+    Return the display string "mention (name)" for a user, appending
+    #discriminator only for accounts predating Discord's new username
+    system. getattr with a default replaces the old double-hasattr probe
+    (hasattr is a try/except under the hood).
+    """
+    d = getattr(u, "discriminator", "0")
+    return f"{u.mention} ({u.name}#{d})" if d != "0" else f"{u.mention} ({u.name})"
+
+# Helper predicate for the permission hierarchy check
+def _outranked(actor, target, guild):
+    """
+    Return True if the actor may NOT moderate the target
+
+    A moderator can only act on members below them in the role hierarchy;
+    the server owner is exempt and can act on anyone. Shared by ban, kick,
+    timeout, and warn so the top_role comparisons live in one place.
+    """
+    return target.top_role >= actor.top_role and actor.id != guild.owner_id
+
 # Helper function to create error embeds
 async def send_error(interaction, message):
     """
@@ -184,7 +671,7 @@ async def send_error(interaction, message):
     embed = discord.Embed(
         title="Error",
         description=message,
-        color=discord.Color.red()  # Red consistently indicates errors
+        color=_RED  # Red consistently indicates errors
     )
     
     # Handle the case where we've already sent an initial response
@@ -193,6 +680,36 @@ async def send_error(interaction, message):
     else:
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+# Shared executor for threshold-triggered automatic actions
+async def _run_auto_action(interaction, user, action, warning_count):
+    """
+    Apply a threshold-triggered automatic action and announce it
+
+    Looks the action up in _AUTO_ACTIONS and runs the shared
+    execute/announce/log sequence with one error path for all three
+    action kinds. Called from the tail of warn() when the warning count
+    hits a configured threshold.
+    """
+    log_label, execute, verb, duration_label = _AUTO_ACTIONS[action]
+    try:
+        # Apply the configured automatic action
+        await execute(user, warning_count)
+
+        # Notify the channel of the automatic action
+        auto_embed = discord.Embed(
+            title="Automatic Action",
+            description=f"{user.mention} has been automatically {verb} after receiving {warning_count} warnings.",
+            color=_RED
+        )
+        await interaction.channel.send(embed=auto_embed)
+        # Log the automatic action
+        if interaction.guild.id in bot._log_channel_ids:
+            await log_action(interaction.guild, log_label, user, bot.user, f"Automatic {action} after {warning_count} warnings", duration_label)
+    except discord.Forbidden:
+        await interaction.channel.send(f"Failed to {action} {user.mention}: Missing permissions.")
+    except Exception as e:
+        await interaction.channel.send(f"Failed to {action} {user.mention}: {str(e)}")
+
 # Setup command
 @bot.tree.command(name="setup", description="Set up the moderation bot for this server")
 @app_commands.default_permissions(administrator=True)  # Restrict to administrators
@@ -207,16 +724,21 @@ async def setup(interaction: discord.Interaction, log_channel: discord.TextChann
     
     Required permissions: Administrator
     """
-    guild_id = str(interaction.guild_id)
-    # Store the log channel ID in the configuration
-    bot.config["log_channels"][guild_id] = log_channel.id
+    # Store the log channel ID in the configuration (int keys in memory;
+    # stringified only when serialized to disk)
+    bot.log_channels[interaction.guild_id] = log_channel.id
+    bot._log_channel_ids.add(interaction.guild_id)
+    # Update the memoized channel so log_action picks up the change at once,
+    # and drop any stale resolution memoized for the old channel
+    bot._log_channel_cache[interaction.guild_id] = log_channel
+    _resolve_log.cache_clear()
     bot.save_config()
     
     # Confirm setup to the user
     embed = discord.Embed(
         title="Setup Complete",
         description=f"Moderation logs will be sent to {log_channel.mention}",
-        color=discord.Color.red()  # Consistent color scheme with other mod actions
+        color=_RED  # Consistent color scheme with other mod actions
     )
     await interaction.response.send_message(embed=embed)
 
@@ -242,7 +764,7 @@ async def ban(interaction: discord.Interaction, user: discord.Member, reason: st
     """
     # Permission hierarchy check - prevents moderators from banning higher-ranked users
     # Exception made for server owner who can ban anyone
-    if user.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
+    if _outranked(interaction.user, user, interaction.guild):
         await send_error(interaction, "You cannot ban someone with a role higher than or equal to yours.")
         return
     
@@ -257,13 +779,19 @@ async def ban(interaction: discord.Interaction, user: discord.Member, reason: st
         embed = discord.Embed(
             title="User Banned",
             description=f"{user.mention} has been banned from the server.",
-            color=discord.Color.red()
+            color=_RED
         )
         embed.add_field(name="Reason", value=reason or "No reason provided")
         
-        await interaction.response.send_message(embed=embed)
-        # Log the action for audit purposes
-        await log_action(interaction.guild, "Ban", user, interaction.user, reason)
+        # Send the response and the audit log entry concurrently - they are
+        # independent HTTP requests, so serializing them just adds latency
+        if interaction.guild.id in bot._log_channel_ids:
+            await asyncio.gather(
+                interaction.response.send_message(embed=embed),
+                log_action(interaction.guild, "Ban", user, interaction.user, reason)
+            )
+        else:
+            await interaction.response.send_message(embed=embed)
         
     except discord.Forbidden:
         # Bot lacks permission to perform the action
@@ -293,34 +821,37 @@ async def unban(interaction: discord.Interaction, user_id: str, reason: str = No
     Required permissions: Ban Members
     """
     try:
-        # Convert string ID to integer
+        # Convert string ID to integer and build the snowflake stand-in
+        # once - the same object serves both API calls below
         user_id = int(user_id)
-        
+        banned_user = discord.Object(id=user_id)
+
         # Check if the user is actually banned
         # This approach is more efficient than fetching all bans first
         try:
             # Try to fetch the ban entry directly
-            ban_entry = await interaction.guild.fetch_ban(discord.Object(id=user_id))
+            await interaction.guild.fetch_ban(banned_user)
             # If we get here, the user is banned
         except discord.NotFound:
             # User is not banned
             await send_error(interaction, "This user is not banned.")
             return
-        
+
         # Execute the unban
-        await interaction.guild.unban(discord.Object(id=user_id), reason=reason)
+        await interaction.guild.unban(banned_user, reason=reason)
         
         # Notify the channel of successful action
         embed = discord.Embed(
             title="User Unbanned",
             description=f"User with ID {user_id} has been unbanned from the server.",
-            color=discord.Color.red()
+            color=_RED
         )
         embed.add_field(name="Reason", value=reason or "No reason provided")
         
         await interaction.response.send_message(embed=embed)
         # Log the action for audit purposes
-        await log_action(interaction.guild, "Unban", f"User ID: {user_id}", interaction.user, reason)
+        if interaction.guild.id in bot._log_channel_ids:
+            await log_action(interaction.guild, "Unban", f"User ID: {user_id}", interaction.user, reason)
         
     except ValueError:
         # Handle non-numeric user IDs
@@ -353,7 +884,7 @@ async def kick(interaction: discord.Interaction, user: discord.Member, reason: s
     """
     # Permission hierarchy check - prevents moderators from kicking higher-ranked users
     # Exception made for server owner who can kick anyone
-    if user.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
+    if _outranked(interaction.user, user, interaction.guild):
         await send_error(interaction, "You cannot kick someone with a role higher than or equal to yours.")
         return
     
@@ -365,13 +896,19 @@ async def kick(interaction: discord.Interaction, user: discord.Member, reason: s
         embed = discord.Embed(
             title="User Kicked",
             description=f"{user.mention} has been kicked from the server.",
-            color=discord.Color.red()
+            color=_RED
         )
         embed.add_field(name="Reason", value=reason or "No reason provided")
         
-        await interaction.response.send_message(embed=embed)
-        # Log the action for audit purposes
-        await log_action(interaction.guild, "Kick", user, interaction.user, reason)
+        # Send the response and the audit log entry concurrently - they are
+        # independent HTTP requests, so serializing them just adds latency
+        if interaction.guild.id in bot._log_channel_ids:
+            await asyncio.gather(
+                interaction.response.send_message(embed=embed),
+                log_action(interaction.guild, "Kick", user, interaction.user, reason)
+            )
+        else:
+            await interaction.response.send_message(embed=embed)
         
     except discord.Forbidden:
         # Bot lacks permission to perform the action
@@ -403,54 +940,27 @@ async def timeout(interaction: discord.Interaction, user: discord.Member, durati
     """
     # Permission hierarchy check - prevents moderators from timing out higher-ranked users
     # Exception made for server owner who can timeout anyone
-    if user.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
+    if _outranked(interaction.user, user, interaction.guild):
         await send_error(interaction, "You cannot timeout someone with a role higher than or equal to yours.")
         return
     
     try:
-        # Parse duration string into seconds
-        # This flexible parsing allows moderators to use natural time formats
-        duration_seconds = 0
-        
-        # Improved duration parsing with better error handling
-        if duration.endswith("s"):
-            try:
-                duration_seconds = int(duration[:-1])
-            except ValueError:
-                await send_error(interaction, f"Invalid duration format: '{duration}'. Use numbers followed by s, m, h, or d (e.g., 30m, 1h, 1d).")
-                return
-        elif duration.endswith("m"):
-            try:
-                duration_seconds = int(duration[:-1]) * 60
-            except ValueError:
-                await send_error(interaction, f"Invalid duration format: '{duration}'. Use numbers followed by s, m, h, or d (e.g., 30m, 1h, 1d).")
-                return
-        elif duration.endswith("h"):
-            try:
-                duration_seconds = int(duration[:-1]) * 3600
-            except ValueError:
-                await send_error(interaction, f"Invalid duration format: '{duration}'. Use numbers followed by s, m, h, or d (e.g., 30m, 1h, 1d).")
-                return
-        elif duration.endswith("d"):
-            try:
-                duration_seconds = int(duration[:-1]) * 86400
-            except ValueError:
-                await send_error(interaction, f"Invalid duration format: '{duration}'. Use numbers followed by s, m, h, or d (e.g., 30m, 1h, 1d).")
-                return
-        else:
-            await send_error(interaction, "Invalid duration format. Use s, m, h, or d (e.g., 30m, 1h, 1d).")
+        # Parse duration string into seconds with one regex match and a
+        # multiplier lookup - a single error path for all malformed input
+        m = _DUR_RE.fullmatch(duration)
+        if not m:
+            await send_error(interaction, f"Invalid duration format: '{duration}'. Use numbers followed by s, m, h, or d (e.g., 30m, 1h, 1d).")
             return
-        
+        duration_seconds = int(m[1]) * _MULT[m[2]]
+
         # Ensure duration is positive
         if duration_seconds <= 0:
             await send_error(interaction, "Duration must be positive.")
             return
-        
+
         # Discord has a maximum timeout duration of 28 days
-        # This ensures we don't exceed that limit
-        if duration_seconds > 2419200:  # 28 days in seconds
-            duration_seconds = 2419200
-            await interaction.followup.send("Duration exceeded maximum of 28 days. Setting timeout to 28 days.", ephemeral=True)
+        # Clamp in one expression so we never exceed that limit
+        duration_seconds = min(duration_seconds, 2419200)  # 28 days in seconds
         
         # Calculate the end time and apply the timeout
         until = discord.utils.utcnow() + datetime.timedelta(seconds=duration_seconds)
@@ -460,14 +970,20 @@ async def timeout(interaction: discord.Interaction, user: discord.Member, durati
         embed = discord.Embed(
             title="User Timed Out",
             description=f"{user.mention} has been timed out.",
-            color=discord.Color.red()
+            color=_RED
         )
         embed.add_field(name="Duration", value=duration)
         embed.add_field(name="Reason", value=reason or "No reason provided")
         
-        await interaction.response.send_message(embed=embed)
-        # Log the action for audit purposes
-        await log_action(interaction.guild, "Timeout", user, interaction.user, reason, duration)
+        # Send the response and the audit log entry concurrently - they are
+        # independent HTTP requests, so serializing them just adds latency
+        if interaction.guild.id in bot._log_channel_ids:
+            await asyncio.gather(
+                interaction.response.send_message(embed=embed),
+                log_action(interaction.guild, "Timeout", user, interaction.user, reason, duration)
+            )
+        else:
+            await interaction.response.send_message(embed=embed)
         
     except discord.Forbidden:
         # Bot lacks permission to perform the action
@@ -513,31 +1029,33 @@ async def clear(interaction: discord.Interaction, amount: int, user: discord.Mem
             
             # Delete messages that pass the filter
             # Note: Discord only allows bulk deletion of messages less than 14 days old
-            deleted = await interaction.channel.purge(limit=amount, check=check, before=datetime.datetime.now())
+            deleted = await interaction.channel.purge(limit=amount, check=check)
             
             # Report the number of messages deleted
             embed = discord.Embed(
                 title="Messages Cleared",
                 description=f"Deleted {len(deleted)} messages from {user.mention}.",
-                color=discord.Color.red()
+                color=_RED
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
             # Log the action for audit purposes
-            await log_action(interaction.guild, "Clear", user, interaction.user, f"Cleared {len(deleted)} messages from {user.name}")
+            if interaction.guild.id in bot._log_channel_ids:
+                await log_action(interaction.guild, "Clear", user, interaction.user, f"Cleared {len(deleted)} messages from {user.name}")
         else:
             # Delete messages without filtering
             # Note: Discord only allows bulk deletion of messages less than 14 days old
-            deleted = await interaction.channel.purge(limit=amount, before=datetime.datetime.now())
+            deleted = await interaction.channel.purge(limit=amount)
             
             # Report the number of messages deleted
             embed = discord.Embed(
                 title="Messages Cleared",
                 description=f"Deleted {len(deleted)} messages.",
-                color=discord.Color.red()
+                color=_RED
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
             # Log the action for audit purposes
-            await log_action(interaction.guild, "Clear", interaction.channel, interaction.user, f"Cleared {len(deleted)} messages from {interaction.channel.name}")
+            if interaction.guild.id in bot._log_channel_ids:
+                await log_action(interaction.guild, "Clear", interaction.channel, interaction.user, f"Cleared {len(deleted)} messages from {interaction.channel.name}")
             
     except discord.Forbidden:
         # Bot lacks permission to perform the action
@@ -574,107 +1092,52 @@ async def warn(interaction: discord.Interaction, user: discord.Member, reason: s
     """
     # Permission hierarchy check - prevents moderators from warning higher-ranked users
     # Exception made for server owner who can warn anyone
-    if user.top_role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
+    if _outranked(interaction.user, user, interaction.guild):
         await send_error(interaction, "You cannot warn someone with a role higher than or equal to yours.")
         return
-    
-    guild_id = str(interaction.guild.id)
-    user_id = str(user.id)
-    
-    # Initialize warnings structure if this is the first warning in this guild
-    if guild_id not in bot.config["warnings"]:
-        bot.config["warnings"][guild_id] = {}
-    
-    # Initialize warnings array if this is the first warning for this user
-    if user_id not in bot.config["warnings"][guild_id]:
-        bot.config["warnings"][guild_id][user_id] = []
-    
-    # Create and store the warning object
-    warning = {
-        "reason": reason or "No reason provided",
-        "moderator": interaction.user.id,
-        "timestamp": datetime.datetime.now().isoformat()  # Store as ISO format for serialization
-    }
-    
-    bot.config["warnings"][guild_id][user_id].append(warning)
-    bot.save_config()
-    
-    warning_count = len(bot.config["warnings"][guild_id][user_id])
+
+    # Acknowledge within Discord's 3-second window before any persistence
+    # or threshold work, so a loaded bot never shows "did not respond"
+    await interaction.response.defer()
+
+    key = (interaction.guild.id, user.id)
+
+    # Create and store the warning object - a compact slotted record with
+    # an epoch timestamp; ISO formatting happens only when journaled
+    warning = WarnRecord(reason or "No reason provided", interaction.user.id, time.time())
+
+    # Append one line to the journal - full history lives on disk only
+    await bot.append_warning(key[0], key[1], warning)
+
+    # Bump the flat counter - the threshold decision never touches the
+    # history list itself
+    warning_count = bot._warn_counts[key] = bot._warn_counts.get(key, 0) + 1
     
     # Notify the channel of the warning
     embed = discord.Embed(
         title="User Warned",
         description=f"{user.mention} has been warned.",
-        color=discord.Color.red()
+        color=_RED
     )
     embed.add_field(name="Reason", value=reason or "No reason provided")
     embed.add_field(name="Warning Count", value=str(warning_count))
     
-    await interaction.response.send_message(embed=embed)
-    # Log the action for audit purposes
-    await log_action(interaction.guild, "Warning", user, interaction.user, reason)
+    # Send the response and the audit log entry concurrently - they are
+    # independent HTTP requests, so serializing them just adds latency
+    if interaction.guild.id in bot._log_channel_ids:
+        await asyncio.gather(
+            interaction.followup.send(embed=embed),
+            log_action(interaction.guild, "Warning", user, interaction.user, reason)
+        )
+    else:
+        await interaction.followup.send(embed=embed)
     
     # Check if automatic action should be taken based on warning count
-    # This implements the progressive discipline system
-    for threshold, action in bot.config["warn_thresholds"].items():
-        if warning_count == int(threshold):
-            if action == "timeout":
-                # Apply 1-hour timeout
-                until = discord.utils.utcnow() + datetime.timedelta(hours=1)
-                try:
-                    await user.timeout(until, reason=f"Automatic timeout after {threshold} warnings")
-                    
-                    # Notify the channel of the automatic action
-                    auto_embed = discord.Embed(
-                        title="Automatic Action",
-                        description=f"{user.mention} has been automatically timed out for 1 hour after receiving {threshold} warnings.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.channel.send(embed=auto_embed)
-                    # Log the automatic action
-                    await log_action(interaction.guild, "Auto-Timeout", user, bot.user, f"Automatic timeout after {threshold} warnings", "1 hour")
-                except discord.Forbidden:
-                    await interaction.channel.send(f"Failed to timeout {user.mention}: Missing permissions.")
-                except Exception as e:
-                    await interaction.channel.send(f"Failed to timeout {user.mention}: {str(e)}")
-            
-            elif action == "kick":
-                # Apply automatic kick
-                try:
-                    await user.kick(reason=f"Automatic kick after {threshold} warnings")
-                    
-                    # Notify the channel of the automatic action
-                    auto_embed = discord.Embed(
-                        title="Automatic Action",
-                        description=f"{user.mention} has been automatically kicked after receiving {threshold} warnings.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.channel.send(embed=auto_embed)
-                    # Log the automatic action
-                    await log_action(interaction.guild, "Auto-Kick", user, bot.user, f"Automatic kick after {threshold} warnings")
-                except discord.Forbidden:
-                    await interaction.channel.send(f"Failed to kick {user.mention}: Missing permissions.")
-                except Exception as e:
-                    await interaction.channel.send(f"Failed to kick {user.mention}: {str(e)}")
-            
-            elif action == "ban":
-                # Apply automatic ban
-                try:
-                    await user.ban(reason=f"Automatic ban after {threshold} warnings")
-                    
-                    # Notify the channel of the automatic action
-                    auto_embed = discord.Embed(
-                        title="Automatic Action",
-                        description=f"{user.mention} has been automatically banned after receiving {threshold} warnings.",
-                        color=discord.Color.red()
-                    )
-                    await interaction.channel.send(embed=auto_embed)
-                    # Log the automatic action
-                    await log_action(interaction.guild, "Auto-Ban", user, bot.user, f"Automatic ban after {threshold} warnings")
-                except discord.Forbidden:
-                    await interaction.channel.send(f"Failed to ban {user.mention}: Missing permissions.")
-                except Exception as e:
-                    await interaction.channel.send(f"Failed to ban {user.mention}: {str(e)}")
+    # This implements the progressive discipline system - the precompiled
+    # map makes this a single O(1) lookup, and the dispatch table shares
+    # one embed/send/log path between timeout, kick, and ban
+    if (action := bot._threshold_map.get(warning_count)) in _AUTO_ACTIONS:
+        await _run_auto_action(interaction, user, action, warning_count)
 
 # Warnings command
 @bot.tree.command(name="warnings", description="View warnings for a user")
@@ -694,50 +1157,54 @@ async def warnings(interaction: discord.Interaction, user: discord.Member):
     
     Required permissions: Moderate Members
     """
-    guild_id = str(interaction.guild.id)
-    user_id = str(user.id)
-    
-    # Check if the user has any warnings
-    if (guild_id not in bot.config["warnings"] or 
-        user_id not in bot.config["warnings"][guild_id] or
-        not bot.config["warnings"][guild_id][user_id]):
-        
+    # Fast no-warnings check against the counter before touching the disk
+    if not bot._warn_counts.get((interaction.guild.id, user.id)):
         # Report no warnings
-        embed = discord.Embed(
-            title="No Warnings",
-            description=f"{user.mention} has no warnings.",
-            color=discord.Color.red()
-        )
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=_no_warn_embed(user), ephemeral=True)
         return
-    
-    warnings_list = bot.config["warnings"][guild_id][user_id]
-    
-    # Create an embed to display the warnings
+
+    # Cold path: stream the user's history back out of the journal
+    # (bounded to the warn_history_cap most recent entries)
+    warnings_list = await bot.get_user_warnings(interaction.guild.id, user.id)
+
+    # Render at most _MAX_EMBED_FIELDS rows (Discord's hard embed limit),
+    # keeping the most recent entries; warn_history_cap can retain more
+    # on disk than a single embed is allowed to show
+    display = list(warnings_list)[-_MAX_EMBED_FIELDS:]
+
+    # Create an embed to display the warnings - the counter carries the
+    # lifetime total even when the rendered history is capped
+    total = bot._warn_counts.get((interaction.guild.id, user.id), len(warnings_list))
+    description = f"{user.mention} has {total} warning(s)."
+    if len(display) < total:
+        description += f" Showing the {len(display)} most recent."
     embed = discord.Embed(
         title=f"Warnings for {user.name}",
-        description=f"{user.mention} has {len(warnings_list)} warning(s).",
-        color=discord.Color.red()
+        description=description,
+        color=_RED
     )
-    
+
     # Add each warning as a field in the embed
-    for i, warning in enumerate(warnings_list, 1):
+    # Most warnings come from the same few moderators, so memoize the
+    # member lookup instead of repeating it for every row
+    mod_cache = {}
+    for i, warning in enumerate(display, 1):
         # Get the moderator who issued the warning
-        moderator = interaction.guild.get_member(warning["moderator"])
-        moderator_name = "Unknown Moderator"
-        
-        # Handle case where moderator is no longer in the server
-        if moderator:
-            moderator_name = moderator.name
-        
-        # Parse and format the timestamp
-        timestamp = datetime.datetime.fromisoformat(warning["timestamp"])
-        formatted_time = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        
+        moderator_name = mod_cache.get(warning.moderator)
+        if moderator_name is None:
+            moderator = interaction.guild.get_member(warning.moderator)
+            # Handle case where moderator is no longer in the server
+            moderator_name = moderator.name if moderator else "Unknown Moderator"
+            mod_cache[warning.moderator] = moderator_name
+
+        # Discord renders <t:unix:f> markers client-side in the viewer's
+        # own timezone - no datetime parse or strftime needed here
+        formatted_time = f"<t:{int(warning.timestamp)}:f>"
+
         # Add the warning details
         embed.add_field(
             name=f"Warning {i}",
-            value=f"**Reason:** {warning['reason']}\n**Moderator:** {moderator_name}\n**Date:** {formatted_time}",
+            value=f"**Reason:** {warning.reason}\n**Moderator:** {moderator_name}\n**Date:** {formatted_time}",
             inline=False
         )
     
@@ -763,39 +1230,34 @@ async def clearwarnings(interaction: discord.Interaction, user: discord.Member):
     
     Required permissions: Administrator
     """
-    guild_id = str(interaction.guild.id)
-    user_id = str(user.id)
-    
-    # Check if the user has any warnings
-    if (guild_id not in bot.config["warnings"] or 
-        user_id not in bot.config["warnings"][guild_id] or
-        not bot.config["warnings"][guild_id][user_id]):
-        
+    key = (interaction.guild.id, user.id)
+
+    # Check if the user has any warnings - the counter is authoritative
+    warning_count = bot._warn_counts.pop(key, 0)
+    if not warning_count:
         # Report no warnings to clear
-        embed = discord.Embed(
-            title="No Warnings",
-            description=f"{user.mention} has no warnings to clear.",
-            color=discord.Color.red()
-        )
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=_no_warn_embed(user, " to clear"), ephemeral=True)
         return
-    
-    # Count warnings before clearing them
-    warning_count = len(bot.config["warnings"][guild_id][user_id])
-    # Clear all warnings for the user
-    bot.config["warnings"][guild_id][user_id] = []
-    bot.save_config()
+
+    # Acknowledge before persistence so the interaction can't time out
+    # while the tombstone is queued and the log entry posted
+    await interaction.response.defer()
+
+    # Record a tombstone in the journal; the history itself lives on disk
+    # and is skipped past the tombstone on future reads
+    await bot.append_warning(key[0], key[1], clear=True)
     
     # Report successful clearing of warnings
     embed = discord.Embed(
         title="Warnings Cleared",
         description=f"Cleared {warning_count} warning(s) for {user.mention}.",
-        color=discord.Color.red()
+        color=_RED
     )
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
     # Log the action for audit purposes
-    await log_action(interaction.guild, "Clear Warnings", user, interaction.user, f"Cleared {warning_count} warnings")
+    if interaction.guild.id in bot._log_channel_ids:
+        await log_action(interaction.guild, "Clear Warnings", user, interaction.user, f"Cleared {warning_count} warnings")
 
 # Run the bot
 if __name__ == "__main__":